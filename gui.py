@@ -1,13 +1,15 @@
+import os
 import sys
-import time
+import threading
 import shutil
 import json
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Callable, List
 
-from PySide6.QtCore import Qt, QMimeData, QThread, Signal, QSize
-from PySide6.QtGui import QDragEnterEvent, QDropEvent, QAction
+from PySide6.QtCore import Qt, QMimeData, QObject, QRunnable, QThreadPool, Signal, QSize
+from PySide6.QtGui import QDragEnterEvent, QDropEvent, QIcon, QPixmap
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -16,7 +18,7 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QPushButton,
     QLabel,
-    QTextEdit,
+    QPlainTextEdit,
     QFileDialog,
     QProgressBar,
     QMessageBox,
@@ -26,6 +28,8 @@ from PySide6.QtWidgets import (
     QSizePolicy,
 )
 
+from main import _extrair_json_puro, analisar_pdfs, preencher_modelo_word
+
 
 # ==========================
 # Caminho do modelo Word padrão (ainda pode ser útil no futuro)
@@ -43,18 +47,29 @@ def _app_base() -> Path:
 
 TEMPLATE_DOCX = _app_base() / "Pet Inicial modelo para IA.docx"
 
+_PDF_SUFFIX = ".pdf"
+
+
+def _is_pdf(caminho: str | Path) -> bool:
+    """
+    Checa a extensão .pdf (sem diferenciar maiúsculas).
+    Aceita str direto, sem precisar montar um Path só para isso.
+    """
+    return os.path.splitext(caminho)[1].casefold() == _PDF_SUFFIX
+
 
 # ==========================
 # “Agente de IA” (implementação real)
 # ==========================
-def chamar_agente_ia_pdf(caminhos_pdfs: list[Path]) -> str:
+def chamar_agente_ia_pdf(
+    caminhos_pdfs: list[Path], cancelado: Optional[threading.Event] = None
+) -> str:
     """
     Encaminha para a função real do seu agente em main.py.
     Agora usando analisar_pdfs (vários PDFs).
     """
-    from main import analisar_pdfs
     # Aqui NÃO vamos gerar Word direto, só o texto
-    return analisar_pdfs(caminhos_pdfs, gerar_word=False)
+    return analisar_pdfs(caminhos_pdfs, gerar_word=False, cancelado=cancelado)
 
 
 # ==========================
@@ -63,55 +78,82 @@ def chamar_agente_ia_pdf(caminhos_pdfs: list[Path]) -> str:
 @dataclass
 class JobParams:
     arquivos: list[Path]
-    func: Callable[[list[Path]], str]
+    func: Callable[[list[Path], threading.Event], str]
 
 
-class IAWorker(QThread):
-    progressed = Signal(int)
-    finished_ok = Signal(str)
+class WorkerSignals(QObject):
+    """
+    Sinais dos workers: QRunnable não é QObject, então os sinais ficam aqui.
+    Emitidos na thread do pool, chegam na janela via conexão enfileirada.
+    """
+    finished_ok = Signal(object)
     failed = Signal(str)
 
+
+class IAWorker(QRunnable):
     def __init__(self, params: JobParams):
         super().__init__()
+        # a janela guarda a referência até o fim: o pool não deve apagar o objeto
+        self.setAutoDelete(False)
+        self.signals = WorkerSignals()
         self.params = params
-        self._cancel = False
+        # repassado para o agente: o cancelamento é visto entre os uploads
+        # e a chamada da IA, não só depois que ela termina
+        self._cancel = threading.Event()
 
     def cancel(self) -> None:
-        self._cancel = True
+        self._cancel.set()
 
     def run(self) -> None:
         try:
-            # Fase inicial (0% → 40%), subindo de 5 em 5
-            for p in range(0, 15, 5):  # 0, 5, 10, ..., 40
-                if self._cancel:
-                    self.failed.emit("Execução cancelada.")
-                    return
-                self.progressed.emit(p)
-                time.sleep(0.05)
-
-            if self._cancel:
-                self.failed.emit("Execução cancelada.")
+            if self._cancel.is_set():
+                self.signals.failed.emit("Execução cancelada.")
                 return
 
             # Chama a IA UMA vez com todos os PDFs
-            resp = self.params.func(self.params.arquivos)
+            resp = self.params.func(self.params.arquivos, self._cancel)
 
-            if self._cancel:
-                self.failed.emit("Execução cancelada.")
+            if self._cancel.is_set():
+                self.signals.failed.emit("Execução cancelada.")
                 return
 
-            # Fase final (40% → 100%), subindo de 5 em 5
-            for p in range(45, 105, 5):  # 45, 50, ..., 100
-                if self._cancel:
-                    self.failed.emit("Execução cancelada.")
-                    return
-                self.progressed.emit(min(p, 100))
-                time.sleep(0.05)
+            self.signals.finished_ok.emit(resp)
 
-            self.finished_ok.emit(resp)
+        except Exception as exc:
+            self.signals.failed.emit(f"Erro ao consultar a IA: {exc!s}")
+
+
+
+class WordWorker(QRunnable):
+    """
+    Gera o .docx (JSON → modelo preenchido → save) fora da thread da UI:
+    o save do python-docx serializa e compacta o XML e pode travar a janela.
+    """
+
+    def __init__(self, texto: str):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = WorkerSignals()
+        self.texto = texto
+
+    def run(self) -> None:
+        try:
+            # Limpa ```json ... ``` se o modelo devolveu em bloco de código
+            json_puro = _extrair_json_puro(self.texto)
+
+            # Converte para dicionário (deve bater com as chaves do modelo Word)
+            dados = json.loads(json_puro)
+            if not isinstance(dados, dict):
+                raise ValueError("JSON retornado não é um objeto/dicionário.")
+
+            # Gera o .docx usando o modelo e as chaves (na pasta padrão do main)
+            self.signals.finished_ok.emit(preencher_modelo_word(dados))
 
         except Exception as exc:
-            self.failed.emit(f"Erro ao consultar a IA: {exc!s}")
+            self.signals.failed.emit(
+                "Não foi possível gerar o Word a partir da resposta da IA.\n\n"
+                f"Detalhes: {exc}"
+            )
 
 
 
@@ -121,7 +163,10 @@ class IAWorker(QThread):
 class DropZone(QFrame):
     file_selected = Signal(Path)
 
-    def __init__(self) -> None:
+    TITULO_PADRAO = "Arraste um PDF aqui"
+    SUBTITULO_PADRAO = 'ou clique em "Selecionar PDF"'
+
+    def __init__(self, icone: Optional[QPixmap] = None) -> None:
         super().__init__()
         self.setAcceptDrops(True)
         self.setObjectName("DropZone")
@@ -131,25 +176,33 @@ class DropZone(QFrame):
         lay = QVBoxLayout(self)
         self.icon_label = QLabel()
         self.icon_label.setAlignment(Qt.AlignCenter)
-        self.icon_label.setPixmap(
-            self.style().standardIcon(QStyle.SP_DialogOpenButton).pixmap(QSize(48, 48))
-        )
-        self.title = QLabel("Arraste um PDF aqui")
+        if icone is None:
+            icone = self.style().standardIcon(QStyle.SP_DialogOpenButton).pixmap(QSize(48, 48))
+        self.icon_label.setPixmap(icone)
+        self.title = QLabel(self.TITULO_PADRAO)
         self.title.setAlignment(Qt.AlignCenter)
-        self.subtitle = QLabel('ou clique em "Selecionar PDF"')
+        self.subtitle = QLabel(self.SUBTITULO_PADRAO)
         self.subtitle.setAlignment(Qt.AlignCenter)
 
         lay.addWidget(self.icon_label)
         lay.addWidget(self.title)
         lay.addWidget(self.subtitle)
 
+    def reset_defaults(self) -> None:
+        """Volta título/subtítulo aos textos iniciais."""
+        self.title.setText(self.TITULO_PADRAO)
+        self.subtitle.setText(self.SUBTITULO_PADRAO)
+
     def dragEnterEvent(self, event: QDragEnterEvent) -> None:
         md: QMimeData = event.mimeData()
-        if md.hasUrls():
-            for u in md.urls():
-                if u.toLocalFile().lower().endswith(".pdf"):
-                    event.acceptProposedAction()
-                    return
+        if not md.hasUrls():
+            event.ignore()
+            return
+        # dropEvent só usa o primeiro arquivo, então basta validar ele
+        local = md.urls()[0].toLocalFile()
+        if _is_pdf(local):
+            event.acceptProposedAction()
+            return
         event.ignore()
 
     def dropEvent(self, event: QDropEvent) -> None:
@@ -157,24 +210,109 @@ class DropZone(QFrame):
         if not urls:
             return
         local = urls[0].toLocalFile()
-        if local and local.lower().endswith(".pdf"):
+        if local and _is_pdf(local):
             self.file_selected.emit(Path(local))
         else:
             QMessageBox.warning(self, "Arquivo inválido", "Envie apenas arquivos PDF.")
 
 
+# ==========================
+# Folha de estilo (QSS) por tema
+# ==========================
+@lru_cache(maxsize=2)
+def _build_qss(dark: bool) -> str:
+    """
+    Monta o QSS do tema claro/escuro. Fica em cache: cada tema é
+    formatado uma única vez por execução.
+    """
+    base_fg = "#EAECEF" if dark else "#1F2328"
+    base_bg = "#0D1117" if dark else "#FFFFFF"
+    card_bg = "#161B22" if dark else "#F6F8FA"
+    accent = "#2F81F7" if dark else "#0969DA"
+    subtle = "#8B949E" if dark else "#57606A"
+
+    return f"""
+        QMainWindow {{
+            background: {base_bg};
+            color: {base_fg};
+        }}
+        QLabel {{
+            color: {base_fg};
+            font-size: 14px;
+        }}
+        #ArquivoLabel {{
+            color: {subtle};
+        }}
+        QFrame#DropZone {{
+            background: {card_bg};
+            border: 2px dashed {subtle};
+            border-radius: 16px;
+        }}
+        QPushButton {{
+            background: {card_bg};
+            border: 1px solid rgba(127,127,127,0.25);
+            border-radius: 10px;
+            padding: 8px 12px;
+            color: {base_fg};
+        }}
+        QPushButton:hover {{
+            border-color: {accent};
+        }}
+        QPushButton:disabled {{
+            opacity: .5;
+        }}
+        QPlainTextEdit {{
+            background: {card_bg};
+            border: 1px solid rgba(127,127,127,0.25);
+            border-radius: 10px;
+            padding: 8px 10px;
+            color: {base_fg};
+            selection-background-color: {accent};
+        }}
+        QProgressBar {{
+            background: {card_bg};
+            border: 1px solid rgba(127,127,127,0.25);
+            border-radius: 10px;
+            text-align: center;
+            color: {base_fg};
+            min-width: 220px;
+            padding: 2px;
+        }}
+        QProgressBar::chunk {{
+            background-color: {accent};
+            border-radius: 8px;
+        }}
+        QMenuBar, QMenu {{
+            background: {card_bg};
+            color: {base_fg};
+        }}
+        QMenu::item:selected {{
+            background: {accent};
+            color: white;
+        }}
+    """
+
+
 # ==========================
 # Janela Principal
 # ==========================
 class MainWindow(QMainWindow):
+    # ícones gerados uma vez e compartilhados entre janelas
+    _icon_open: Optional[QPixmap] = None
+    _icon_app: Optional[QIcon] = None
+
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("Assistente IA — PDF")
         self.setMinimumSize(900, 580)
-        self.setWindowIcon(self.style().standardIcon(QStyle.SP_ComputerIcon))
+        if MainWindow._icon_app is None:
+            MainWindow._icon_app = self.style().standardIcon(QStyle.SP_ComputerIcon)
+        self.setWindowIcon(MainWindow._icon_app)
 
         self._arquivos: List[Path] = []
         self._worker: Optional[IAWorker] = None
+        self._word_worker: Optional[WordWorker] = None
+        self._qss_atual: Optional[str] = None
 
         self._build_ui()
         self._apply_style(dark=True)
@@ -206,7 +344,11 @@ class MainWindow(QMainWindow):
         root.addLayout(bar)
 
         # Dropzone
-        self.drop = DropZone()
+        if MainWindow._icon_open is None:
+            MainWindow._icon_open = (
+                self.style().standardIcon(QStyle.SP_DialogOpenButton).pixmap(QSize(48, 48))
+            )
+        self.drop = DropZone(MainWindow._icon_open)
         self.drop.file_selected.connect(self.set_file)
         root.addWidget(self.drop)
 
@@ -235,8 +377,10 @@ class MainWindow(QMainWindow):
 
         # Saída da IA
         out_lbl = QLabel("Resposta da IA:")
-        self.out = QTextEdit()
+        self.out = QPlainTextEdit()
         self.out.setReadOnly(True)
+        # saída só leitura: não precisa guardar histórico de desfazer
+        self.out.setUndoRedoEnabled(False)
         self.out.setPlaceholderText("A resposta aparecerá aqui…")
         root.addWidget(out_lbl)
         root.addWidget(self.out, 1)
@@ -262,72 +406,13 @@ class MainWindow(QMainWindow):
 
     # ---------- Estilo ----------
     def _apply_style(self, *, dark: bool) -> None:
-        base_fg = "#EAECEF" if dark else "#1F2328"
-        base_bg = "#0D1117" if dark else "#FFFFFF"
-        card_bg = "#161B22" if dark else "#F6F8FA"
-        accent = "#2F81F7" if dark else "#0969DA"
-        subtle = "#8B949E" if dark else "#57606A"
-
-        self.setStyleSheet(f"""
-            QMainWindow {{
-                background: {base_bg};
-                color: {base_fg};
-            }}
-            QLabel {{
-                color: {base_fg};
-                font-size: 14px;
-            }}
-            #ArquivoLabel {{
-                color: {subtle};
-            }}
-            QFrame#DropZone {{
-                background: {card_bg};
-                border: 2px dashed {subtle};
-                border-radius: 16px;
-            }}
-            QPushButton {{
-                background: {card_bg};
-                border: 1px solid rgba(127,127,127,0.25);
-                border-radius: 10px;
-                padding: 8px 12px;
-                color: {base_fg};
-            }}
-            QPushButton:hover {{
-                border-color: {accent};
-            }}
-            QPushButton:disabled {{
-                opacity: .5;
-            }}
-            QTextEdit {{
-                background: {card_bg};
-                border: 1px solid rgba(127,127,127,0.25);
-                border-radius: 10px;
-                padding: 8px 10px;
-                color: {base_fg};
-                selection-background-color: {accent};
-            }}
-            QProgressBar {{
-                background: {card_bg};
-                border: 1px solid rgba(127,127,127,0.25);
-                border-radius: 10px;
-                text-align: center;
-                color: {base_fg};
-                min-width: 220px;
-                padding: 2px;
-            }}
-            QProgressBar::chunk {{
-                background-color: {accent};
-                border-radius: 8px;
-            }}
-            QMenuBar, QMenu {{
-                background: {card_bg};
-                color: {base_fg};
-            }}
-            QMenu::item:selected {{
-                background: {accent};
-                color: white;
-            }}
-        """)
+        qss = _build_qss(dark)
+        # setStyleSheet refaz o polish de todos os widgets: só chama se mudou
+        if qss is self._qss_atual:
+            return
+        self._qss_atual = qss
+        # aplicado no QApplication: um único QSS compartilhado por todos os widgets
+        QApplication.instance().setStyleSheet(qss)
 
     # ---------- Lógica ----------
     def on_select_file(self) -> None:
@@ -339,11 +424,11 @@ class MainWindow(QMainWindow):
         if not paths:
             return
 
-        arquivos = [Path(p) for p in paths]
-        self.set_files(arquivos)
+        # filtra ainda como str: só vira Path o que for PDF
+        self.set_files([Path(p) for p in paths if _is_pdf(p)])
 
-    def set_files(self, arquivos: list[Path]) -> None:
-        validos = [p for p in arquivos if p.suffix.lower() == ".pdf"]
+    def set_files(self, validos: list[Path]) -> None:
+        # quem chama já filtrou só PDFs (on_select_file / set_file)
         if not validos:
             QMessageBox.warning(self, "Arquivo inválido", "Envie apenas arquivos PDF.")
             return
@@ -358,7 +443,7 @@ class MainWindow(QMainWindow):
 
     def set_file(self, p: Path) -> None:
         # usado pelo DropZone (arrastar/soltar 1 arquivo)
-        if p.suffix.lower() != ".pdf":
+        if not _is_pdf(p):
             QMessageBox.warning(self, "Arquivo inválido", "Envie apenas arquivos PDF.")
             return
         self.set_files([p])
@@ -369,7 +454,7 @@ class MainWindow(QMainWindow):
         self._apply_style(dark=dark)
 
     def on_run(self) -> None:
-        if self._worker and self._worker.isRunning():
+        if self._worker is not None:
             return
         if not self._arquivos:
             QMessageBox.warning(
@@ -381,61 +466,76 @@ class MainWindow(QMainWindow):
 
         params = JobParams(arquivos=self._arquivos, func=chamar_agente_ia_pdf)
         self._worker = IAWorker(params)
-        self._worker.progressed.connect(self.progress.setValue)
-        self._worker.finished_ok.connect(self._on_finished_ok)
-        self._worker.failed.connect(self._on_failed)
+        self._worker.signals.finished_ok.connect(self._on_finished_ok)
+        self._worker.signals.failed.connect(self._on_failed)
 
         self.btn_run.setEnabled(False)
         self.btn_cancel.setEnabled(True)
-        self.progress.setValue(0)
+        # Sem progresso real durante a chamada: barra "ocupada" (indeterminada)
+        self.progress.setRange(0, 0)
         self.out.clear()
-        self._worker.start()
+        QThreadPool.globalInstance().start(self._worker)
 
     def on_cancel(self) -> None:
-        if self._worker and self._worker.isRunning():
+        if self._worker is not None:
             self._worker.cancel()
 
     def _on_finished_ok(self, text: str) -> None:
+        self._worker = None
         self.btn_run.setEnabled(True)
         self.btn_cancel.setEnabled(False)
+        self.progress.setRange(0, 100)
         self.progress.setValue(100)
-        self.out.setPlainText(text)
+        # um único relayout/repaint para respostas grandes
+        self.out.setUpdatesEnabled(False)
+        try:
+            self.out.setPlainText(text)
+        finally:
+            self.out.setUpdatesEnabled(True)
 
     def _on_failed(self, msg: str) -> None:
+        self._worker = None
         self.btn_run.setEnabled(True)
         self.btn_cancel.setEnabled(False)
+        self.progress.setRange(0, 100)
         self.progress.setValue(0)
         QMessageBox.critical(self, "Erro", msg)
 
     def on_clear(self) -> None:
         """Limpa a saída da IA, desmarca PDFs e reseta a interface."""
-        
-        # 1. Limpa o texto da resposta
-        self.out.clear()
 
-        # 2. Limpa arquivos selecionados
-        self._arquivos = []
+        # várias mudanças seguidas: um único repaint no final
+        self.setUpdatesEnabled(False)
+        try:
+            # 1. Limpa o texto da resposta
+            self.out.clear()
 
-        # 3. Atualiza o label de arquivos
-        self.lbl_arquivo.setText("Nenhum PDF selecionado")
+            # 2. Limpa arquivos selecionados
+            self._arquivos = []
 
-        # 4. Reseta barra de progresso
-        self.progress.setValue(0)
+            # 3. Atualiza o label de arquivos
+            self.lbl_arquivo.setText("Nenhum PDF selecionado")
 
-        # 5. Garante que botões estão no estado correto
-        self.btn_run.setEnabled(True)
-        self.btn_cancel.setEnabled(False)
+            # 4. Reseta barra de progresso
+            self.progress.setRange(0, 100)
+            self.progress.setValue(0)
 
-        # 6. (opcional) limpar DropZone visualmente — só texto interno
-        self.drop.title.setText("Arraste um PDF aqui")
-        self.drop.subtitle.setText('ou clique em "Selecionar PDF"')
+            # 5. Garante que botões estão no estado correto
+            self.btn_run.setEnabled(True)
+            self.btn_cancel.setEnabled(False)
 
+            # 6. (opcional) limpar DropZone visualmente — só texto interno
+            self.drop.reset_defaults()
+        finally:
+            self.setUpdatesEnabled(True)
+            self.update()
 
     def on_generate_word(self) -> None:
         """
         Gera o Word usando a RESPOSTA JÁ EXIBIDA da IA.
         - Não chama o agente novamente.
-        - Usa o mesmo fluxo do main.py: _extrair_json_puro + preencher_modelo_word.
+        - Usa o mesmo fluxo do main.py: _extrair_json_puro + preencher_modelo_word
+          (rodando no WordWorker, fora da thread da UI).
         - Depois pergunta onde salvar o arquivo .docx.
         """
         if not self._arquivos:
@@ -457,37 +557,24 @@ class MainWindow(QMainWindow):
             )
             return
 
-        try:
-            # Reaproveita as mesmas funções do main.py
-            from main import _extrair_json_puro, preencher_modelo_word
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Erro",
-                f"Não foi possível importar as funções do main.py:\n{e}",
-            )
+        if self._word_worker is not None:
             return
 
-        try:
-            # Limpa ```json ... ``` se o modelo devolveu em bloco de código
-            json_puro = _extrair_json_puro(texto)
-
-            # Converte para dicionário (deve bater com as chaves do modelo Word)
-            dados = json.loads(json_puro)
-            if not isinstance(dados, dict):
-                raise ValueError("JSON retornado não é um objeto/dicionário.")
+        # Monta e salva o .docx fora da thread da UI
+        self.btn_word.setEnabled(False)
+        self._word_worker = WordWorker(texto)
+        self._word_worker.signals.finished_ok.connect(self._on_word_ok)
+        self._word_worker.signals.failed.connect(self._on_word_failed)
+        QThreadPool.globalInstance().start(self._word_worker)
 
-            # Gera o .docx usando o modelo e as chaves (na pasta padrão do main)
-            caminho_docx = preencher_modelo_word(dados)
+    def _on_word_failed(self, msg: str) -> None:
+        self._word_worker = None
+        self.btn_word.setEnabled(True)
+        QMessageBox.critical(self, "Erro ao gerar Word", msg)
 
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Erro ao gerar Word",
-                "Não foi possível gerar o Word a partir da resposta da IA.\n\n"
-                f"Detalhes: {e}",
-            )
-            return
+    def _on_word_ok(self, caminho_docx: Path) -> None:
+        self._word_worker = None
+        self.btn_word.setEnabled(True)
 
         # Agora pergunta ONDE salvar o arquivo
         sugestao_nome = Path(caminho_docx).name
@@ -510,7 +597,7 @@ class MainWindow(QMainWindow):
 
         # Copia o arquivo gerado para o caminho escolhido
         try:
-            shutil.copy2(str(caminho_docx), str(save_path))
+            shutil.copyfile(str(caminho_docx), str(save_path))
         except Exception as e:
             QMessageBox.critical(
                 self,
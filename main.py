@@ -1,10 +1,9 @@
 from __future__ import annotations
-import os, sys, json
+import re, sys, io, json, threading
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI
-from docx import Document  # python-docx
-from docx.shared import RGBColor,Pt
+
+from openai_client import PROMPT_ID, apagar_arquivos, enviar_arquivos, get_client
 
 # ---------- paths base ----------
 
@@ -13,48 +12,56 @@ def _app_base() -> Path:
         return Path(sys.executable).resolve().parent
     return Path(__file__).resolve().parent
 
-env_path = _app_base() / ".env"
-load_dotenv(dotenv_path=env_path, override=False)
-
 # modelo Word (coloque esse arquivo ao lado do .exe ou do main.py)
 MODELO_WORD = _app_base() / "Pet Inicial modelo para IA.docx"
 
-_client: OpenAI | None = None
-
-def _get_client() -> OpenAI:
-    global _client
-    if _client is None:
-        api_key = "OPENAI-KEY"
-        if not api_key:
-            raise RuntimeError(
-                "OPENAI_API_KEY não encontrada.\n"
-                f"Procurei em: {env_path}\n"
-                "Crie um arquivo .env ao lado do executável com:\n"
-                "OPENAI_API_KEY=sua_chave_aqui"
-            )
-        _client = OpenAI(api_key=api_key)
-    return _client
-
-# ID do agente salvo
-_PROMPT_ID = "pmpt_691610f1f92c8195813434067cd51f490c72f28960d54f47"
-
-
 # ---------- helpers para JSON e Word ----------
 
+# texto inserido em {VINCULO_COM_TRABALHO} quando a resposta indica vínculo
+_TEXTO_JUSTICA_GRATUITA = (
+    "C)\tDA JUSTIÇA GRATUITA\n\n"
+    "Primeiramente, o art. 129, par. único da Lei 8.213/91  garante a isenção quanto a "
+    "custas e verbas sucumbenciais nas causas decorrentes de acidente do trabalho.\n\n"
+    "Além da isenção garantida pela lei, é importante aludir que a parte Autora não tem "
+    "condições de arcar com quaisquer custas, despesas e/ou honorários advocatícios sem "
+    "prejuízo do próprio sustento.\n\n"
+    "Portanto, requer-se o reconhecimento da isenção conferida pelo art. 129, par. único "
+    "da Lei 8.213/91, abstendo a parte autora de qualquer ônus monetário no presente caso "
+    "ou, que sejam deferidos os benefícios da justiça gratuita, nos moldes Lei 1.060/50, "
+    "bem como, artigo 98 e seguintes do CPC, considerando declaração de hipossuficiência "
+    "e provas a ela anexadas."
+)
+
+# {QUALQUER_COISA} até o primeiro "}" — mesmo critério do scanner manual antigo
+_PLACEHOLDER_RE = re.compile(r"\{([^}]*)\}")
+
+# tudo que não for letra/dígito (\w = isalnum() + "_"), espaço ou "-"
+_NOME_ARQUIVO_INVALIDO_RE = re.compile(r"[^\w \-]")
+
+@lru_cache(maxsize=4)
+def _ler_modelo_bytes(caminho_modelo: Path, _mtime_ns: int) -> bytes:
+    """
+    Lê o .docx do modelo uma vez por versão do arquivo (a data de
+    modificação faz parte da chave, então editar o modelo invalida o cache).
+    """
+    return caminho_modelo.read_bytes()
+
 def _extrair_json_puro(texto: str) -> str:
     """
     Remove ```json ... ``` ou ``` ... ``` se o modelo devolver em bloco de código.
     """
     texto = texto.strip()
     if texto.startswith("```"):
-        linhas = texto.splitlines()
         # remove a primeira linha ``` ou ```json
-        if linhas and linhas[0].startswith("```"):
-            linhas = linhas[1:]
+        fim_primeira = texto.find("\n")
+        if fim_primeira == -1:
+            return ""
+        texto = texto[fim_primeira + 1:]
         # remove última linha ``` se tiver
-        if linhas and linhas[-1].startswith("```"):
-            linhas = linhas[:-1]
-        texto = "\n".join(linhas).strip()
+        inicio_ultima = texto.rfind("\n") + 1
+        if texto.startswith("```", inicio_ultima):
+            texto = texto[:inicio_ultima]
+        texto = texto.strip()
     return texto
 
 def preencher_modelo_word(
@@ -65,118 +72,103 @@ def preencher_modelo_word(
     Abre o modelo Word (com placeholders tipo {NOME_CLIENTE}) e substitui
     pelos valores do dicionário `dados`.
     """
+    # import adiado: python-docx (lxml) só carrega quando for gerar o Word
+    from docx import Document  # python-docx
+    from docx.oxml.ns import qn
+    from docx.shared import RGBColor,Pt
+    from docx.text.paragraph import Paragraph
+
     if caminho_modelo is None:
         caminho_modelo = MODELO_WORD
 
-    if not caminho_modelo.exists():
-        raise FileNotFoundError(f"Modelo Word não encontrado: {caminho_modelo}")
+    try:
+        mtime_ns = caminho_modelo.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Modelo Word não encontrado: {caminho_modelo}") from None
 
-    doc = Document(str(caminho_modelo))
+    doc = Document(io.BytesIO(_ler_modelo_bytes(caminho_modelo, mtime_ns)))
     AZUL = RGBColor(0, 0, 255)
 
     # ---------- PREPARAÇÃO DOS DADOS COM REGRA ESPECIAL PARA VINCULO_COM_TRABALHO ----------
-    dados_preparados = {}
-    
     # Copia todos os dados, tratando valores None e strings vazias
-    for chave, valor in dados.items():
-        if valor is None:
-            continue
-        valor_str = str(valor).strip()
-        if valor_str:
-            dados_preparados[chave] = valor_str
-    
+    dados_preparados = {
+        chave: valor_str
+        for chave, valor in dados.items()
+        if valor is not None and (valor_str := str(valor).strip())
+    }
+
     # REGRA ESPECIAL: VINCULO_COM_TRABALHO
-    # Primeiro verifica se existe esse campo nos dados
-        # REGRA ESPECIAL: VINCULO_COM_TRABALHO
     # Primeiro verifica se existe esse campo nos dados
     if "VINCULO_COM_TRABALHO" in dados_preparados:
-        vinculo_valor = str(dados_preparados["VINCULO_COM_TRABALHO"]).upper().strip()
+        vinculo_valor = dados_preparados["VINCULO_COM_TRABALHO"].upper()
 
         # Se em QUALQUER lugar da resposta aparecer "SIM"
         # (ex: "Sim", "Sim, possui vínculo", "sim.")
-        if "SIM" in vinculo_valor:
-            dados_preparados["VINCULO_COM_TRABALHO"] = (
-                "C)\tDA JUSTIÇA GRATUITA\n\n"
-                "Primeiramente, o art. 129, par. único da Lei 8.213/91  garante a isenção quanto a "
-                "custas e verbas sucumbenciais nas causas decorrentes de acidente do trabalho.\n\n"
-                "Além da isenção garantida pela lei, é importante aludir que a parte Autora não tem "
-                "condições de arcar com quaisquer custas, despesas e/ou honorários advocatícios sem "
-                "prejuízo do próprio sustento.\n\n"
-                "Portanto, requer-se o reconhecimento da isenção conferida pelo art. 129, par. único "
-                "da Lei 8.213/91, abstendo a parte autora de qualquer ônus monetário no presente caso "
-                "ou, que sejam deferidos os benefícios da justiça gratuita, nos moldes Lei 1.060/50, "
-                "bem como, artigo 98 e seguintes do CPC, considerando declaração de hipossuficiência "
-                "e provas a ela anexadas."
-            )
-        else:
-            # Se não tiver "SIM" na resposta, não coloca nada no texto final
-            dados_preparados["VINCULO_COM_TRABALHO"] = ""
+        # Se não tiver "SIM" na resposta, não coloca nada no texto final
+        dados_preparados["VINCULO_COM_TRABALHO"] = (
+            _TEXTO_JUSTICA_GRATUITA if "SIM" in vinculo_valor else ""
+        )
 
 
     # ---------- FUNÇÃO PARA PROCESSAR PARÁGRAFOS ----------
-    def processar_paragrafo(p):
+    # `get` vira variável local (default): sem lookup de atributo nem
+    # acesso à closure a cada placeholder
+    def processar_paragrafo(p, get=dados_preparados.get):
         full = p.text
         if "{" not in full or "}" not in full:
             return
 
         segmentos: list[tuple[str, str]] = []
-        i = 0
-        n = len(full)
-
-        while i < n:
-            if full[i] == "{":
-                j = full.find("}", i + 1)
-                if j == -1:
-                    segmentos.append(("fixo", full[i:]))
-                    break
-
-                chave = full[i + 1:j]
-                # SEMPRE tenta substituir, mesmo que a chave não esteja em dados_preparados
-                # Se não estiver, usa string vazia
-                valor = dados_preparados.get(chave, "")
-                segmentos.append(("valor", valor))
-                i = j + 1
+        pos = 0
+        for m in _PLACEHOLDER_RE.finditer(full):
+            if m.start() > pos:
+                segmentos.append(("fixo", full[pos:m.start()]))
+            # SEMPRE tenta substituir, mesmo que a chave não esteja em dados_preparados
+            # Se não estiver, usa string vazia
+            segmentos.append(("valor", get(m.group(1), "")))
+            pos = m.end()
+        # resto do texto (inclui "{" sem "}" correspondente)
+        if pos < len(full):
+            segmentos.append(("fixo", full[pos:]))
+
+        # Junta trechos vizinhos do mesmo tipo ({A}{B}, ou um valor vazio
+        # entre dois textos fixos): um run só em vez de vários no XML
+        trechos: list[tuple[str, str]] = []
+        for tipo, texto in segmentos:
+            if not texto:
+                continue
+            if trechos and trechos[-1][0] == tipo:
+                trechos[-1] = (tipo, trechos[-1][1] + texto)
             else:
-                prox = full.find("{", i)
-                if prox == -1:
-                    segmentos.append(("fixo", full[i:]))
-                    break
-                else:
-                    segmentos.append(("fixo", full[i:prox]))
-                    i = prox
-
-        # Mantém o estilo do parágrafo
-        estilo = p.style
+                trechos.append((tipo, texto))
+
+        # clear() remove só os runs; o estilo (w:pPr) do parágrafo é mantido
         p.clear()
-        p.style = estilo
 
         # Recria os runs
-        for tipo, texto in segmentos:
-            if not texto:
-                continue
+        for tipo, texto in trechos:
             run = p.add_run(texto)
             if tipo == "valor":
                 run.font.color.rgb = AZUL
                 run.font.name = "Bookman Old Style"
                 run.font.size = Pt(12)
 
-    # Processa parágrafos normais
-    for p in doc.paragraphs:
-        processar_paragrafo(p)
+    # Sondagem rápida: se nenhum texto do corpo tem "{", não há o que substituir
+    # (itertext para no primeiro acerto, sem montar Paragraph nenhum)
+    tem_placeholder = any("{" in t for t in doc.element.body.itertext())
 
-    # Processa tabelas
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for p in cell.paragraphs:
-                    processar_paragrafo(p)
+    if tem_placeholder:
+        # Uma única varredura do XML pega os parágrafos do corpo e os de dentro
+        # de tabelas (inclusive aninhadas), cada <w:p> uma vez só — célula
+        # mesclada não repete. A lista é montada antes porque os runs são
+        # recriados durante o loop.
+        for p_elem in list(doc.element.body.iter(qn("w:p"))):
+            processar_paragrafo(Paragraph(p_elem, doc))
 
     # Gera nome do arquivo de saída
     nome_base = dados_preparados.get("NOME_CLIENTE", "Pet_inicial")
     nome_base = str(nome_base).strip()
-    nome_base = "".join(
-        c for c in nome_base if c.isalnum() or c in (" ", "_", "-")
-    ).strip() or "Pet_inicial"
+    nome_base = _NOME_ARQUIVO_INVALIDO_RE.sub("", nome_base).strip() or "Pet_inicial"
 
     saida_path = caminho_modelo.with_name(f"Pet_inicial_{nome_base}.docx")
     doc.save(str(saida_path))
@@ -188,11 +180,17 @@ def preencher_modelo_word(
 
 # ---------- função para até 5 PDFs + geração opcional do Word ----------
 
-def analisar_pdfs(caminhos_pdfs: list[Path], gerar_word: bool = False) -> str:
+def analisar_pdfs(
+    caminhos_pdfs: list[Path],
+    gerar_word: bool = False,
+    cancelado: threading.Event | None = None,
+) -> str:
     """
     Envia até 5 PDFs para o agente e retorna a resposta em texto.
     Se gerar_word=True, tenta interpretar a resposta como JSON e
     preenche o modelo Word.
+    Se `cancelado` for sinalizado, para antes dos uploads ou antes de
+    chamar o agente (os arquivos já enviados são apagados igual).
 
     Retorno:
         - sempre uma string com a saída da IA;
@@ -214,15 +212,19 @@ def analisar_pdfs(caminhos_pdfs: list[Path], gerar_word: bool = False) -> str:
             return f"Erro: arquivo não é PDF: {p}"
         pdfs_validos.append(p)
 
-    client = _get_client()
+    if cancelado is not None and cancelado.is_set():
+        return "Execução cancelada."
+
+    client = get_client()
 
     file_ids: list[str] = []
     try:
-        # 1) faz upload de todos os PDFs
-        for p in pdfs_validos:
-            with open(p, "rb") as f:
-                uploaded = client.files.create(file=f, purpose="assistants")
-            file_ids.append(uploaded.id)
+        # 1) faz upload de todos os PDFs (em paralelo)
+        enviar_arquivos(client, pdfs_validos, file_ids)
+
+        # a chamada ao agente é a parte mais demorada: não faz se já cancelou
+        if cancelado is not None and cancelado.is_set():
+            return "Execução cancelada."
 
         # 2) monta o conteúdo da mensagem pro agente
         conteudo = []
@@ -233,7 +235,7 @@ def analisar_pdfs(caminhos_pdfs: list[Path], gerar_word: bool = False) -> str:
 
         # 3) chama o agente salvo
         response = client.responses.create(
-            prompt={"id": _PROMPT_ID},
+            prompt={"id": PROMPT_ID},
             input=[
                 {
                     "role": "user",
@@ -269,15 +271,7 @@ def analisar_pdfs(caminhos_pdfs: list[Path], gerar_word: bool = False) -> str:
 
     finally:
         # 5) tenta deletar os arquivos enviados (boa prática)
-        try:
-            if file_ids:
-                for fid in file_ids:
-                    try:
-                        client.files.delete(fid)
-                    except Exception:
-                        pass
-        except Exception:
-            pass
+        apagar_arquivos(client, file_ids)
 
 
 if __name__ == "__main__":
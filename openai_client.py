@@ -0,0 +1,91 @@
+from __future__ import annotations
+import os, sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+# ---------- cliente OpenAI compartilhado (main.py e te.py) ----------
+
+def _app_base() -> Path:
+    if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
+        return Path(sys.executable).resolve().parent
+    return Path(__file__).resolve().parent
+
+env_path = _app_base() / ".env"
+_env_carregado = False
+
+# ID do agente salvo
+PROMPT_ID = "pmpt_691610f1f92c8195813434067cd51f490c72f28960d54f47"
+
+_client: OpenAI | None = None
+
+def get_client() -> OpenAI:
+    """
+    Devolve o único OpenAI do processo: main.py e te.py usam o mesmo
+    pool de conexões HTTP em vez de um cliente cada.
+    """
+    global _client, _env_carregado
+    if _client is None:
+        # .env só é lido quando alguém precisa da API, não na abertura do app
+        if not _env_carregado:
+            from dotenv import load_dotenv
+
+            load_dotenv(dotenv_path=env_path, override=False)
+            _env_carregado = True
+
+        # import adiado: o SDK (httpx, pydantic...) só carrega na primeira chamada
+        from openai import OpenAI
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError(
+                "OPENAI_API_KEY não encontrada.\n"
+                f"Procurei em: {env_path}\n"
+                "Crie um arquivo .env ao lado do executável com:\n"
+                "OPENAI_API_KEY=sua_chave_aqui"
+            )
+        _client = OpenAI(api_key=api_key)
+    return _client
+
+def _enviar_pdf(client: OpenAI, caminho: Path) -> str:
+    with open(caminho, "rb", buffering=1 << 20) as f:
+        return client.files.create(
+            file=(caminho.name, f, "application/pdf"), purpose="assistants"
+        ).id
+
+def enviar_arquivos(client: OpenAI, caminhos: list[Path], file_ids: list[str]) -> None:
+    """
+    Envia os PDFs em paralelo (cada upload é só I/O de rede) e acrescenta
+    os ids em `file_ids`, na ordem de `caminhos`.
+    Se algum upload falhar, os que subiram continuam em `file_ids` (para
+    quem chama conseguir apagá-los com apagar_arquivos) e o primeiro erro
+    é relançado.
+    """
+    if not caminhos:
+        return
+    with ThreadPoolExecutor(max_workers=len(caminhos)) as ex:
+        futuros = [ex.submit(_enviar_pdf, client, p) for p in caminhos]
+
+    file_ids.extend(f.result() for f in futuros if f.exception() is None)
+    for f in futuros:
+        f.result()
+
+def _apagar_arquivo(client: OpenAI, file_id: str) -> None:
+    try:
+        client.files.delete(file_id)
+    except Exception:
+        pass  # limpeza é só boa prática: não derruba a análise
+
+def apagar_arquivos(client: OpenAI, file_ids: list[str]) -> None:
+    """
+    Apaga os arquivos enviados: um files.delete por arquivo, todos ao mesmo
+    tempo, então a espera é a do delete mais lento. Erros são ignorados.
+    """
+    if not file_ids:
+        return
+    with ThreadPoolExecutor(max_workers=len(file_ids)) as ex:
+        for fid in file_ids:
+            ex.submit(_apagar_arquivo, client, fid)
@@ -1,37 +1,7 @@
 from __future__ import annotations
-import os, sys
 from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI
 
-# ---------- setup cliente (igual já vimos) ----------
-
-def _app_base() -> Path:
-    if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
-        return Path(sys.executable).resolve().parent
-    return Path(__file__).resolve().parent
-
-env_path = _app_base() / ".env"
-load_dotenv(dotenv_path=env_path, override=False)
-
-_client: OpenAI | None = None
-
-def _get_client() -> OpenAI:
-    global _client
-    if _client is None:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise RuntimeError(
-                "OPENAI_API_KEY não encontrada.\n"
-                f"Procurei em: {env_path}\n"
-                "Crie um arquivo .env ao lado do executável com:\n"
-                "OPENAI_API_KEY=sua_chave_aqui"
-            )
-        _client = OpenAI(api_key=api_key)
-    return _client
-
-# ID do agente salvo
-_PROMPT_ID = "pmpt_691610f1f92c8195813434067cd51f490c72f28960d54f47"
+from openai_client import PROMPT_ID, apagar_arquivos, enviar_arquivos, get_client
 
 # ---------- AQUI: função para até 5 PDFs ----------
 
@@ -54,15 +24,12 @@ def analisar_pdfs(caminhos_pdfs: list[Path]) -> str:
             return f"Erro: arquivo não é PDF: {p}"
         pdfs_validos.append(p)
 
-    client = _get_client()
+    client = get_client()
 
     file_ids: list[str] = []
     try:
-        # 1) faz upload de todos os PDFs
-        for p in pdfs_validos:
-            with open(p, "rb") as f:
-                uploaded = client.files.create(file=f, purpose="assistants")
-            file_ids.append(uploaded.id)
+        # 1) faz upload de todos os PDFs (em paralelo)
+        enviar_arquivos(client, pdfs_validos, file_ids)
 
         # 2) monta o conteúdo da mensagem pro agente
         conteudo = []
@@ -74,7 +41,7 @@ def analisar_pdfs(caminhos_pdfs: list[Path]) -> str:
 
         # 3) chama o agente salvo
         response = client.responses.create(
-            prompt={"id": _PROMPT_ID},
+            prompt={"id": PROMPT_ID},
             input=[
                 {
                     "role": "user",
@@ -91,15 +58,7 @@ def analisar_pdfs(caminhos_pdfs: list[Path]) -> str:
 
     finally:
         # 4) tenta deletar os arquivos enviados (boa prática)
-        try:
-            if file_ids:
-                for fid in file_ids:
-                    try:
-                        client.files.delete(fid)
-                    except Exception:
-                        pass
-        except Exception:
-            pass
+        apagar_arquivos(client, file_ids)
 
 if __name__ == "__main__":
     # exemplo com 2 PDFs